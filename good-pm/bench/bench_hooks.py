@@ -0,0 +1,535 @@
+#!/usr/bin/env python3
+"""
+Good PM Hook Benchmarks
+
+Generates synthetic Claude Code transcripts and .good-pm trees, runs each
+hook path as a fresh process under sh (the way Claude Code runs hooks), and reports
+latency percentiles and peak RSS per path. Exits non-zero when a latency
+budget is exceeded, so it can gate changes to the hooks.
+
+Scenarios:
+- stop:early-approve@N       pm_work_detected is false (flag check only)
+- stop:stop-hook-active@N    second Stop of a review cycle (flag reset)
+- stop:block@N               PM work found, no update indicator (full scan)
+- stop:indicator-approve@N   last assistant message says "no updates needed"
+- context:full               new session, full payload injected
+- context:unchanged          same session, unchanged marker injected
+- status:cold / status:warm  good-pm-status.py without / with its index
+
+N is the transcript size in entries. Stop runs are cold (checkpoints
+removed before each run) unless --warm is given.
+
+Before timing, a parity check renders --parity generated session files
+through both good-pm-context.sh and good-pm-hookd.py (several byte budgets,
+first and repeated prompt) and fails if their outputs differ: the hook
+server is only a transparent fallback if it matches the script exactly.
+
+Usage:
+    python3 good-pm/bench/bench_hooks.py [--sizes 1000,10000,100000] [--runs 20]
+        [--specs 20] [--issues 200] [--payload-kb 4] [--warm]
+        [--budget 'stop:block=500'] [--budget '*=2000'] [--percentile 95]
+        [--parity 25] [--json results.json] [--keep DIR]
+
+Budgets are milliseconds at --percentile. A budget name matches a scenario
+exactly, the scenario without its @size suffix, or "*" for all scenarios.
+
+Exit codes:
+- 0 - All scenarios within budget
+- 1 - At least one budget exceeded
+- 2 - A hook produced unexpected output, or the hook server and
+      good-pm-context.sh disagree (parity check)
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+PLUGIN_DIR = Path(__file__).resolve().parent.parent
+HOOKS_DIR = PLUGIN_DIR / "hooks"
+TEMPLATES_DIR = PLUGIN_DIR / "templates"
+
+STOP_HOOK = ["python3", str(HOOKS_DIR / "good-pm-session-update.py")]
+CONTEXT_HOOK = ["bash", str(HOOKS_DIR / "good-pm-context.sh")]
+STATUS_ENGINE = ["python3", str(HOOKS_DIR / "good-pm-status.py")]
+HOOK_SERVER = ["python3", str(HOOKS_DIR / "good-pm-hookd.py")]
+
+# Session budgets the parity check renders every generated session file with
+PARITY_BUDGETS = (0, 200, 1024, 8192)
+
+WORDS = (
+    "the a of to and in is it that for refactor parser cache request handler "
+    "module test config error value return function class update file path"
+).split()
+
+
+# --- Fixture generation ------------------------------------------------------
+
+def _text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def _payload(rng: random.Random, payload_kb: float) -> str:
+    """Tool payload of roughly exponential size around payload_kb."""
+    size = int(rng.expovariate(1 / max(payload_kb, 0.01)) * 1024)
+    line = _text(rng, 12) + "\n"
+    return (line * (size // len(line) + 1))[:size]
+
+
+def _entry(rng: random.Random, entry_type: str, content, session_id: str, parent) -> dict:
+    """A transcript line shaped like Claude Code's JSONL entries."""
+    return {
+        "parentUuid": parent,
+        "isSidechain": False,
+        "userType": "external",
+        "cwd": "/home/dev/project",
+        "sessionId": session_id,
+        "version": "1.0.0",
+        "gitBranch": "main",
+        "type": entry_type,
+        "message": {"role": entry_type, "content": content},
+        "uuid": str(uuid.UUID(int=rng.getrandbits(128))),
+        "timestamp": "2026-01-01T00:00:00.000Z",
+    }
+
+
+def write_transcript(path: Path, entries: int, payload_kb: float, seed: int = 0) -> None:
+    """Write a transcript of `entries` lines.
+
+    Turns cycle through string prompts, assistant text, tool_use blocks with
+    large inputs and tool_result blocks with large outputs. PM keywords only
+    appear in the final user prompt, so the Stop hook cannot exit its scan
+    early; the final assistant line is a plain "Done." (no update indicator).
+    """
+    rng = random.Random(seed)
+    session_id = str(uuid.UUID(int=rng.getrandbits(128)))
+    parent = None
+    with open(path, "w") as f:
+        for i in range(entries - 2):
+            kind = i % 4
+            if kind == 0:
+                entry = _entry(rng, "user", _text(rng, rng.randint(5, 60)), session_id, parent)
+            elif kind == 1:
+                content = [{"type": "text", "text": _text(rng, rng.randint(10, 120))}]
+                entry = _entry(rng, "assistant", content, session_id, parent)
+            elif kind == 2:
+                content = [{
+                    "type": "tool_use",
+                    "id": f"toolu_{i:08d}",
+                    "name": rng.choice(["Read", "Edit", "Write", "Bash", "Grep"]),
+                    "input": {"file_path": "/home/dev/project/src/module.py",
+                              "content": _payload(rng, payload_kb)},
+                }]
+                entry = _entry(rng, "assistant", content, session_id, parent)
+            else:
+                content = [{
+                    "type": "tool_result",
+                    "tool_use_id": f"toolu_{i - 1:08d}",
+                    "content": _payload(rng, payload_kb),
+                }]
+                entry = _entry(rng, "user", content, session_id, parent)
+            parent = entry["uuid"]
+            f.write(json.dumps(entry) + "\n")
+        prompt = _entry(rng, "user", "Now break the spec into issues", session_id, parent)
+        f.write(json.dumps(prompt) + "\n")
+        done = _entry(rng, "assistant", [{"type": "text", "text": "Done."}], session_id, prompt["uuid"])
+        f.write(json.dumps(done) + "\n")
+
+
+def indicator_line(seed: int = 0) -> str:
+    rng = random.Random(seed)
+    content = [{"type": "text", "text": "Reviewed the session file - no updates needed."}]
+    return json.dumps(_entry(rng, "assistant", content, "bench", None)) + "\n"
+
+
+def write_session(project: Path, pm_work_detected: bool, stamp: int) -> None:
+    """Write session/current.md with the given flag; stamp changes its mtime/size."""
+    template = (TEMPLATES_DIR / "SESSION_TEMPLATE.md").read_text()
+    content = (
+        template
+        .replace("pm_work_detected: false", f"pm_work_detected: {'true' if pm_work_detected else 'false'}")
+        .replace("has_content: false", "has_content: true")
+        .replace("last_updated: null", f"last_updated: {stamp}")
+    )
+    (project / ".good-pm" / "session" / "current.md").write_text(content)
+
+
+def parity_session(rng: random.Random) -> str:
+    """A random session/current.md exercising the context hook's flag and trim rules."""
+    lines = []
+    if rng.random() < 0.9:
+        flag = rng.choice(["true", "true", "true", "false", "true  # note", "True"])
+        lines += ["---", "pm_work_detected: false", f"has_content: {flag}",
+                  "last_updated: null", "---"]
+    lines += ["# Session Context", ""]
+    for _ in range(rng.randint(0, 3)):
+        lines.append(rng.choice([_text(rng, rng.randint(1, 15)), "", "Prose before sections"]))
+    sections = ["Current Focus", "Key Decisions", "Blockers", "Notes for Next Session",
+                "Recent Changes", "Key Decisions  ", "Open Questions"]
+    for name in rng.sample(sections, rng.randint(0, len(sections))):
+        lines += [f"## {name}", ""]
+        for _ in range(rng.randint(0, 12)):
+            kind = rng.random()
+            if kind < 0.4:
+                lines.append(f"- {_text(rng, rng.randint(2, 25))}")
+            elif kind < 0.55:
+                lines.append(f"{rng.randint(1, 20)}. {_text(rng, rng.randint(2, 20))}")
+            elif kind < 0.65:
+                lines.append(f"* D{rng.randint(1, 9)}: caf\u00e9 na\u00efve \u2014 {_text(rng, 6)}")
+            elif kind < 0.8:
+                lines.append(f"  {_text(rng, rng.randint(2, 12))}")
+            elif kind < 0.9:
+                lines.append("")
+            else:
+                lines.append(rng.choice(["---", "### Subheading", "**Bold** line"]))
+    text = "\n".join(lines)
+    return text if rng.random() < 0.1 else text + "\n"
+
+
+def ask_hook_server(project: Path, event: str, stdin: bytes, env: dict) -> str:
+    """Send one event to the hook server in project (same protocol as good-pm-hook.py)."""
+    request = {"event": event, "cwd": os.path.realpath(project),
+               "input": stdin.decode("utf-8"), "env": env}
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(30)
+        sock.connect(str(project / ".good-pm" / "hookd.sock"))
+        sock.sendall(json.dumps(request).encode("utf-8"))
+        sock.shutdown(socket.SHUT_WR)
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    response = json.loads(b"".join(chunks).decode("utf-8"))
+    if "error" in response:
+        raise UnexpectedOutput(f"hook server: {response['error']}")
+    return response["stdout"]
+
+
+def check_parity(project: Path, cases: int, seed: int = 0) -> int:
+    """Render generated session files through good-pm-context.sh and the hook server.
+
+    Each file is rendered at every PARITY_BUDGETS budget, twice per session
+    (full payload, then the unchanged marker). Raises UnexpectedOutput on the
+    first mismatch; returns the number of comparisons.
+    """
+    rng = random.Random(seed)
+    session = project / ".good-pm" / "session" / "current.md"
+    socket_path = project / ".good-pm" / "hookd.sock"
+    server = subprocess.Popen(HOOK_SERVER + ["--idle-timeout", "60"], cwd=project,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        for _ in range(100):
+            if socket_path.exists():
+                break
+            time.sleep(0.05)
+        compared = 0
+        for case in range(cases):
+            session.write_text(parity_session(rng))
+            for budget in PARITY_BUDGETS:
+                env = {"GOOD_PM_SESSION_BUDGET": str(budget)}
+                tag = f"{case}-{budget}"
+                script_stdin = json.dumps({"session_id": f"parity-script-{tag}"}).encode()
+                server_stdin = json.dumps({"session_id": f"parity-server-{tag}"}).encode()
+                for prompt in ("first", "repeat"):
+                    script = subprocess.run(CONTEXT_HOOK, cwd=project, input=script_stdin,
+                                            capture_output=True, env={**os.environ, **env})
+                    expected = script.stdout.decode("utf-8", "replace")
+                    actual = ask_hook_server(project, "UserPromptSubmit", server_stdin, env)
+                    if actual != expected:
+                        kept = project.parent / f"parity-{tag}.md"
+                        shutil.copy(session, kept)
+                        raise UnexpectedOutput(
+                            f"parity: server and script differ for case {case}, budget {budget}, "
+                            f"{prompt} prompt (session file saved as {kept} with --keep)\n"
+                            f"script: {expected[-300:]!r}\nserver: {actual[-300:]!r}"
+                        )
+                    compared += 1
+    finally:
+        server.terminate()
+        server.wait()
+        for tracker in session.parent.glob(".injected-parity-*"):
+            tracker.unlink()
+    return compared
+
+
+def write_project(project: Path, specs: int, issues: int, seed: int = 0) -> None:
+    """Create a .good-pm tree with `specs` specs and `issues` issues spread across them."""
+    rng = random.Random(seed)
+    good_pm = project / ".good-pm"
+    for subdir in ("context", "specs", "issues", "session", "templates"):
+        (good_pm / subdir).mkdir(parents=True, exist_ok=True)
+    shutil.copy(TEMPLATES_DIR / "PM_STUB.md", good_pm / "context" / "PM_STUB.md")
+    write_session(project, False, 0)
+
+    spec_names = [f"SPEC_feature-{i:03d}" for i in range(specs)]
+    for name in spec_names:
+        tasks = "\n".join(f"- [ ] {_text(rng, 6)}" for _ in range(rng.randint(3, 12)))
+        (good_pm / "specs" / f"{name}.md").write_text(
+            f"# {name}\n\n## Summary\n{_text(rng, 40)}\n\n## Implementation Plan\n{tasks}\n"
+        )
+    for number in range(1, issues + 1):
+        spec = spec_names[rng.randrange(specs)] if specs else "SPEC_missing"
+        tasks = "\n".join(
+            f"- [{rng.choice(' x')}] {_text(rng, 6)}" for _ in range(rng.randint(0, 8))
+        )
+        (good_pm / "issues" / f"{number:03d}-task-{number}.md").write_text(
+            f"## Title\n{_text(rng, 5)}\n\n"
+            f"## Source\nThis issue is part of the work defined in: `../specs/{spec}.md`\n\n"
+            f"## Description\n{_text(rng, 60)}\n\n## Tasks\n{tasks}\n\n"
+            f"## Acceptance Criteria\n- [ ] {_text(rng, 8)}\n"
+        )
+
+
+# --- Measurement -------------------------------------------------------------
+
+# Hooks run under a small sh launcher. A child forked from this process would
+# inherit its RSS high-water mark (Linux carries it across fork and exec), so
+# its ru_maxrss would measure the benchmark, not the hook. sh forks the hook,
+# closes stdout once it exits (which ends the timed section), then execs a
+# reporter that writes RUSAGE_CHILDREN (kept across exec) and the hook's exit
+# status to the file named by $1.
+RSS_LAUNCHER = (
+    'report=$1; shift\n'
+    '"$@"\n'
+    'status=$?\n'
+    'exec 1>&-\n'
+    'exec python3 -S -c "import resource, sys; '
+    'print(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss, sys.argv[1])" '
+    '"$status" >"$report"\n'
+)
+
+
+def run_hook(command, cwd: Path, stdin: bytes):
+    """Run one hook process. Returns (seconds, peak_rss_bytes, stdout, returncode)."""
+    fd, report = tempfile.mkstemp(prefix="good-pm-bench-rusage-")
+    os.close(fd)
+    try:
+        with tempfile.TemporaryFile() as stderr:
+            start = time.perf_counter()
+            proc = subprocess.Popen(["sh", "-c", RSS_LAUNCHER, "sh", report, *command],
+                                    cwd=cwd, stdin=subprocess.PIPE,
+                                    stdout=subprocess.PIPE, stderr=stderr)
+            proc.stdin.write(stdin)
+            proc.stdin.close()
+            stdout = proc.stdout.read()
+            elapsed = time.perf_counter() - start
+            proc.stdout.close()
+            proc.wait()
+            fields = Path(report).read_text().split()
+            if len(fields) == 2:
+                peak, returncode = int(fields[0]), int(fields[1])
+            else:
+                peak, returncode = 0, proc.returncode or 1
+            if returncode != 0:
+                stderr.seek(0)
+                sys.stderr.write(stderr.read().decode("utf-8", "replace"))
+    finally:
+        os.unlink(report)
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    if sys.platform != "darwin":
+        peak *= 1024
+    return elapsed, peak, stdout.decode("utf-8", "replace"), returncode
+
+
+def percentile(values, pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+class UnexpectedOutput(Exception):
+    pass
+
+
+def measure(name: str, runs: int, setup, command, cwd: Path, stdin, expect) -> dict:
+    """Run a scenario `runs` times; setup() runs untimed before each run.
+
+    stdin is bytes, or a callable returning the bytes for each run.
+    """
+    times, peaks = [], []
+    for _ in range(runs):
+        setup()
+        data = stdin() if callable(stdin) else stdin
+        elapsed, peak, stdout, returncode = run_hook(command, cwd, data)
+        if returncode != 0 or not expect(stdout):
+            raise UnexpectedOutput(f"{name}: exit {returncode}, output {stdout[:200]!r}")
+        times.append(elapsed * 1000)
+        peaks.append(peak)
+    return {
+        "scenario": name,
+        "runs": runs,
+        "p50_ms": percentile(times, 50),
+        "p90_ms": percentile(times, 90),
+        "p99_ms": percentile(times, 99),
+        "max_ms": max(times),
+        "peak_rss_mb": max(peaks) / (1024 * 1024),
+        "times_ms": times,
+    }
+
+
+def decision(expected: str):
+    return lambda stdout: json.loads(stdout or "{}").get("decision") == expected
+
+
+def stop_scenarios(project: Path, transcript: Path, size: int, runs: int, warm: bool):
+    session_dir = project / ".good-pm" / "session"
+    stamp = iter(range(1, 10**9))
+    stdin = json.dumps({"transcript_path": str(transcript), "session_id": "bench"}).encode()
+    active_stdin = json.dumps({"transcript_path": str(transcript), "stop_hook_active": True}).encode()
+
+    def arm(pm_work_detected: bool):
+        def setup():
+            if not warm:
+                for checkpoint in session_dir.glob(".transcript-*.json"):
+                    checkpoint.unlink()
+            write_session(project, pm_work_detected, next(stamp))
+        return setup
+
+    yield measure(f"stop:early-approve@{size}", runs, arm(False), STOP_HOOK,
+                  project, stdin, decision("approve"))
+    yield measure(f"stop:stop-hook-active@{size}", runs, arm(True), STOP_HOOK,
+                  project, active_stdin, decision("approve"))
+    yield measure(f"stop:block@{size}", runs, arm(True), STOP_HOOK,
+                  project, stdin, decision("block"))
+
+    original_size = transcript.stat().st_size
+    with open(transcript, "a") as f:
+        f.write(indicator_line())
+    try:
+        yield measure(f"stop:indicator-approve@{size}", runs, arm(True), STOP_HOOK,
+                      project, stdin, decision("approve"))
+    finally:
+        os.truncate(transcript, original_size)
+
+
+def other_scenarios(project: Path, runs: int):
+    index = project / ".good-pm" / ".status-index.json"
+    sessions = iter(range(10**9))
+    unchanged_stdin = b'{"session_id": "bench-unchanged"}'
+    write_session(project, False, 0)
+
+    yield measure("context:full", runs, lambda: None, CONTEXT_HOOK, project,
+                  lambda: json.dumps({"session_id": f"bench-{next(sessions)}"}).encode(),
+                  lambda out: "[Session Context]" in out)
+    run_hook(CONTEXT_HOOK, project, unchanged_stdin)  # prime the session tracker
+    yield measure("context:unchanged", runs, lambda: None, CONTEXT_HOOK, project,
+                  unchanged_stdin, lambda out: "unchanged" in out)
+    yield measure("status:cold", runs, lambda: index.unlink(missing_ok=True),
+                  STATUS_ENGINE, project, b"", lambda out: "## Summary" in out)
+    yield measure("status:warm", runs, lambda: None,
+                  STATUS_ENGINE, project, b"", lambda out: "## Summary" in out)
+
+
+# --- Reporting ---------------------------------------------------------------
+
+def parse_budgets(specs) -> dict:
+    budgets = {}
+    for spec in specs:
+        name, sep, value = spec.rpartition("=")
+        if not sep or not name:
+            raise ValueError(f"budget must be NAME=MS, got {spec!r}")
+        budgets[name] = float(value)
+    return budgets
+
+
+def budget_for(scenario: str, budgets: dict):
+    for key in (scenario, scenario.split("@", 1)[0], "*"):
+        if key in budgets:
+            return budgets[key]
+    return None
+
+
+def print_table(results, budgets: dict, pct: float) -> int:
+    header = f"{'scenario':<34} {'runs':>5} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9} {'RSS MB':>8}  budget"
+    print(header)
+    print("-" * len(header))
+    failures = 0
+    for r in results:
+        budget = budget_for(r["scenario"], budgets)
+        verdict = ""
+        if budget is not None:
+            observed = percentile(r["times_ms"], pct)
+            ok = observed <= budget
+            failures += not ok
+            verdict = f"{'ok' if ok else 'FAIL'} (p{pct:g} {observed:.1f} {'<=' if ok else '>'} {budget:g})"
+        print(f"{r['scenario']:<34} {r['runs']:>5} {r['p50_ms']:>9.1f} {r['p90_ms']:>9.1f} "
+              f"{r['p99_ms']:>9.1f} {r['max_ms']:>9.1f} {r['peak_rss_mb']:>8.1f}  {verdict}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Good PM hooks")
+    parser.add_argument("--sizes", default="1000,10000,100000",
+                        help="comma-separated transcript sizes in entries (default: 1000,10000,100000)")
+    parser.add_argument("--runs", type=int, default=20, help="runs per scenario (default: 20)")
+    parser.add_argument("--specs", type=int, default=20, help="specs in the generated tree (default: 20)")
+    parser.add_argument("--issues", type=int, default=200, help="issues in the generated tree (default: 200)")
+    parser.add_argument("--payload-kb", type=float, default=4,
+                        help="mean tool_use/tool_result payload size in KiB (default: 4)")
+    parser.add_argument("--warm", action="store_true", help="keep transcript checkpoints between Stop runs")
+    parser.add_argument("--budget", action="append", default=[], metavar="NAME=MS",
+                        help="latency budget in ms at --percentile (repeatable)")
+    parser.add_argument("--percentile", type=float, default=95, help="percentile checked against budgets")
+    parser.add_argument("--parity", type=int, default=25, metavar="N",
+                        help="session files for the server/script parity check (default: 25, 0 = skip)")
+    parser.add_argument("--json", metavar="PATH", help="also write results as JSON")
+    parser.add_argument("--keep", metavar="DIR", help="generate fixtures in DIR and keep them")
+    args = parser.parse_args()
+
+    if not 0 <= args.issues <= 999:
+        parser.error("--issues must be between 0 and 999 (issue numbers are three digits)")
+    try:
+        budgets = parse_budgets(args.budget)
+    except ValueError as exc:
+        parser.error(str(exc))
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    workdir = Path(args.keep) if args.keep else Path(tempfile.mkdtemp(prefix="good-pm-bench-"))
+    workdir.mkdir(parents=True, exist_ok=True)
+
+    results = []
+    try:
+        project = workdir / "project"
+        write_project(project, args.specs, args.issues)
+        if args.parity > 0:
+            compared = check_parity(project, args.parity)
+            print(f"parity: hook server matches good-pm-context.sh ({compared} outputs)",
+                  file=sys.stderr)
+        results.extend(other_scenarios(project, args.runs))
+        for size in sizes:
+            transcript = workdir / f"transcript-{size}.jsonl"
+            if not transcript.exists():
+                write_transcript(transcript, size, args.payload_kb)
+            mb = transcript.stat().st_size / (1024 * 1024)
+            print(f"transcript {size} entries: {mb:.1f} MiB", file=sys.stderr)
+            results.extend(stop_scenarios(project, transcript, size, args.runs, args.warm))
+    except UnexpectedOutput as exc:
+        print(f"unexpected hook output: {exc}", file=sys.stderr)
+        return 2
+    finally:
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    failures = print_table(results, budgets, args.percentile)
+    if args.json:
+        Path(args.json).write_text(json.dumps(
+            {"percentile": args.percentile, "budgets": budgets, "results": results}, indent=2
+        ))
+    if failures:
+        print(f"\n{failures} scenario(s) over budget", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
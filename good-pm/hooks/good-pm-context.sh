@@ -1,6 +1,8 @@
 #!/bin/bash
 # Good PM Context Injection Hook
 # Injects lightweight PM stub on UserPromptSubmit events
+# With --reset (SessionStart after compact/clear) it only forgets what the
+# session was last sent, so the next prompt gets the full payload again
 #
 # Progressive Disclosure (P0):
 # - Injects PM_STUB.md (~30 lines) instead of full PM_CONTRACT.md (~270 lines)
@@ -17,6 +19,133 @@
 GOODPM_DIR=".good-pm"
 STUB="$GOODPM_DIR/context/PM_STUB.md"
 SESSION="$GOODPM_DIR/session/current.md"
+STATE_FILE="$GOODPM_DIR/session/state.json"
+
+# Change-aware injection: re-emit the full payload only when it changed since
+# the last prompt of this Claude session, after compaction (--reset), or
+# every REFRESH_EVERY prompts as a safety net
+REFRESH_EVERY="${GOOD_PM_CONTEXT_REFRESH:-20}"
+case "$REFRESH_EVERY" in ''|*[!0-9]*) REFRESH_EVERY=20 ;; esac
+
+# Byte budget for the injected session context (~4 bytes per token, 0 = unlimited)
+SESSION_BUDGET="${GOOD_PM_SESSION_BUDGET:-8192}"
+case "$SESSION_BUDGET" in ''|*[!0-9]*) SESSION_BUDGET=8192 ;; esac
+
+# Trims session/current.md to SESSION_BUDGET bytes. Drop order, stopping as
+# soon as the file fits: preamble, Key Decisions items (oldest first), other
+# sections (last first), Blockers, Current Focus lines (last first).
+# Frontmatter and the Current Focus / Key Decisions headings are always kept.
+# Prints a one-line report of what was dropped.
+IFS= read -r -d '' TRIM_SESSION_AWK <<'AWK'
+{ n++; line[n] = $0; total += length($0) + 1 }
+END {
+  original = total
+  start = 1
+  if (line[1] == "---") {
+    for (k = 2; k <= n && line[k] != "---"; k++) ;
+    start = k + 1
+  }
+  nu = 0
+  section = ""
+  for (k = start; k <= n; k++) {
+    if (line[k] ~ /^## /) {
+      section = substr(line[k], 4); sub(/[ \t]+$/, "", section)
+      nu++; name[nu] = section
+      if (section == "Current Focus" || section == "Key Decisions") kind[nu] = "keep"
+      else if (section == "Blockers") kind[nu] = "blockers"
+      else kind[nu] = "other"
+      head = nu; current = nu; item = 0
+    } else if (section == "") {
+      if (!pre) { nu++; kind[nu] = "pre"; pre = nu }
+      current = pre
+    } else if (line[k] == "" || line[k] == "---") {
+      current = head
+    } else if (section == "Current Focus") {
+      nu++; kind[nu] = "cf"; current = nu
+    } else if (section == "Key Decisions") {
+      if (line[k] ~ /^([-*]|[0-9]+\.) /) { nu++; kind[nu] = "kd"; item = nu }
+      current = item ? item : head
+    } else {
+      current = head
+    }
+    unit[k] = current
+    bytes[current] += length(line[k]) + 1
+  }
+
+  if (budget > 0 && total > budget) {
+    for (u = 1; u <= nu && total > budget; u++)
+      if (kind[u] == "pre") { drop[u] = 1; total -= bytes[u]; report = report ", preamble" }
+    kd = 0
+    for (u = 1; u <= nu && total > budget; u++)
+      if (kind[u] == "kd") { drop[u] = 1; total -= bytes[u]; kd++ }
+    if (kd) report = report ", " kd " older Key Decisions"
+    for (u = nu; u >= 1 && total > budget; u--)
+      if (kind[u] == "other") { drop[u] = 1; total -= bytes[u]; report = report ", " name[u] }
+    for (u = 1; u <= nu && total > budget; u++)
+      if (kind[u] == "blockers") { drop[u] = 1; total -= bytes[u]; report = report ", Blockers" }
+    cf = 0
+    for (u = nu; u >= 1 && total > budget; u--)
+      if (kind[u] == "cf") { drop[u] = 1; total -= bytes[u]; cf++ }
+    if (cf) report = report ", " cf " Current Focus lines"
+  }
+
+  for (k = 1; k <= n; k++) if (!drop[unit[k]]) print line[k]
+  if (total < original)
+    printf "\n[Session context trimmed to %d-byte budget: dropped %d of %d bytes (%s). Full file: .good-pm/session/current.md]\n", budget, original - total, original, substr(report, 3)
+}
+AWK
+
+# Opt-in instrumentation (GOOD_PM_TRACE=1): one JSONL record per prompt in
+# .good-pm/trace/hooks.jsonl, same format as the Stop hook. Phase timings need
+# bash 5 ($EPOCHREALTIME); older shells record the branch and byte counts only.
+# With tracing off each helper returns on its first test.
+TRACE_FILE="$GOODPM_DIR/trace/hooks.jsonl"
+TRACE_MAX_BYTES=1048576
+TRACE_BACKUPS=3
+TRACE_PHASES=""
+
+trace_ms() {  # trace_ms VAR MICROSECONDS -> VAR="12.345"
+  local frac
+  printf -v frac '%03d' $(( $2 % 1000 ))
+  printf -v "$1" '%d.%s' $(( $2 / 1000 )) "$frac"
+}
+
+trace_phase() {  # trace_phase NAME - time since the last mark
+  [ -n "$GOOD_PM_TRACE" ] && [ -n "$TRACE_MARK" ] || return 0
+  local now=${EPOCHREALTIME/[.,]/} ms
+  trace_ms ms $(( now - TRACE_MARK ))
+  TRACE_PHASES="$TRACE_PHASES${TRACE_PHASES:+, }\"$1\": $ms"
+  TRACE_MARK=$now
+}
+
+trace_finish() {  # trace_finish BRANCH
+  [ -n "$GOOD_PM_TRACE" ] || return 0
+  local total=null ts bytes=0 session=null i
+  if [ -n "$TRACE_START" ]; then
+    trace_ms total $(( ${EPOCHREALTIME/[.,]/} - TRACE_START ))
+    ts=$EPOCHREALTIME
+  else
+    ts=$(date +%s)
+  fi
+  [ -f "$STUB" ] && bytes=$(( bytes + $(wc -c < "$STUB") ))
+  [[ "$HAS_CONTENT" -gt 0 ]] && bytes=$(( bytes + $(wc -c < "$SESSION") ))
+  [ -n "$SESSION_ID" ] && session="\"$SESSION_ID\""
+  mkdir -p "$GOODPM_DIR/trace" 2>/dev/null || return 0
+  if [ -f "$TRACE_FILE" ] && [[ $(wc -c < "$TRACE_FILE") -gt $TRACE_MAX_BYTES ]]; then
+    for (( i = TRACE_BACKUPS - 1; i >= 1; i-- )); do
+      [ -f "$TRACE_FILE.$i" ] && mv -f "$TRACE_FILE.$i" "$TRACE_FILE.$(( i + 1 ))"
+    done
+    mv -f "$TRACE_FILE" "$TRACE_FILE.1"
+  fi
+  printf '{"ts": %s, "hook": "context", "via": "script", "phases": {%s}, "session_id": %s, "has_content": %s, "bytes_read": %d, "branch": "%s", "total_ms": %s}\n' \
+    "$ts" "$TRACE_PHASES" "$session" "$([[ "$HAS_CONTENT" -gt 0 ]] && echo true || echo false)" \
+    "$bytes" "$1" "$total" >> "$TRACE_FILE" 2>/dev/null
+}
+
+if [ -n "$GOOD_PM_TRACE" ]; then
+  TRACE_START=${EPOCHREALTIME/[.,]/}
+  TRACE_MARK=$TRACE_START
+fi
 
 # Early exit if not in a Good PM project
 # This is the core of selective loading - no .good-pm/, no injection
@@ -24,6 +153,61 @@ if [ ! -d "$GOODPM_DIR" ]; then
   exit 0
 fi
 
+# Check for has_content: true flag. The Stop hook mirrors the frontmatter flags
+# into state.json; trust it only when it is newer than current.md
+# Per Decision D4: assumes frontmatter exists (users re-run setup after upgrade)
+HAS_CONTENT=0
+if [ -f "$SESSION" ]; then
+  if [ "$STATE_FILE" -nt "$SESSION" ]; then
+    HAS_CONTENT=$(grep -c '"has_content": true' "$STATE_FILE")
+  else
+    HAS_CONTENT=$(sed -n '/^---$/,/^---$/{ /^---$/d; p; }' "$SESSION" | grep '^has_content:' | grep -c 'true')
+  fi
+fi
+trace_phase flag_check
+
+# Session id from the hook input (stdin JSON); no id means no tracking
+SESSION_ID=""
+if [ ! -t 0 ]; then
+  SESSION_ID=$(sed -n 's/.*"session_id"[[:space:]]*:[[:space:]]*"\([^"]*\)".*/\1/p' | head -n 1 | tr -cd 'A-Za-z0-9_-')
+fi
+trace_phase read_input
+
+# Compaction dropped the injected context from the conversation
+if [ "$1" = "--reset" ]; then
+  [ -n "$SESSION_ID" ] && rm -f "$GOODPM_DIR/session/.injected-$SESSION_ID"
+  trace_finish reset
+  exit 0
+fi
+
+# Nothing to inject (no stub, no session content): print nothing, track nothing
+if [ ! -f "$STUB" ] && [[ "$HAS_CONTENT" -eq 0 ]]; then
+  trace_finish empty
+  exit 0
+fi
+
+if [ -n "$SESSION_ID" ] && [ -d "$GOODPM_DIR/session" ]; then
+  STATE="$GOODPM_DIR/session/.injected-$SESSION_ID"
+  SIGNATURE=$({ [ -f "$STUB" ] && cat "$STUB"; echo "has_content=$HAS_CONTENT budget=$SESSION_BUDGET"; [[ "$HAS_CONTENT" -gt 0 ]] && cat "$SESSION"; } | cksum | tr ' ' '-')
+  LAST_SIGNATURE=""
+  PROMPTS=0
+  if [ -f "$STATE" ]; then
+    read -r LAST_SIGNATURE PROMPTS < "$STATE"
+  fi
+  if [ "$SIGNATURE" = "$LAST_SIGNATURE" ] && [[ "$PROMPTS" -lt "$REFRESH_EVERY" ]]; then
+    echo "$SIGNATURE $((PROMPTS + 1))" > "$STATE"
+    echo ""
+    echo "[Good PM Context unchanged since the previous prompt]"
+    trace_phase signature
+    trace_finish unchanged
+    exit 0
+  fi
+  echo "$SIGNATURE 1" > "$STATE"
+  # Drop trackers of sessions idle for more than a week
+  find "$GOODPM_DIR/session" -name '.injected-*' -mtime +7 -exec rm -f {} + 2>/dev/null
+  trace_phase signature
+fi
+
 # Inject PM Stub if it exists (lightweight context - full contract loaded on-demand by commands)
 if [ -f "$STUB" ]; then
   echo ""
@@ -33,16 +217,17 @@ if [ -f "$STUB" ]; then
 fi
 
 # Inject session context if it exists and has_content frontmatter is true
-# Per Decision D4: assumes frontmatter exists (users re-run setup after upgrade)
-if [ -f "$SESSION" ]; then
-  # Check frontmatter for has_content: true flag
-  HAS_CONTENT=$(sed -n '/^---$/,/^---$/{ /^---$/d; p; }' "$SESSION" | grep '^has_content:' | grep -c 'true')
-  if [[ "$HAS_CONTENT" -gt 0 ]]; then
-    echo ""
-    echo "[Session Context]"
+if [[ "$HAS_CONTENT" -gt 0 ]]; then
+  echo ""
+  echo "[Session Context]"
+  if [[ "$SESSION_BUDGET" -gt 0 ]] && [[ $(wc -c < "$SESSION") -gt "$SESSION_BUDGET" ]]; then
+    LC_ALL=C awk -v budget="$SESSION_BUDGET" "$TRIM_SESSION_AWK" "$SESSION"
+  else
     cat "$SESSION"
-    echo ""
   fi
+  echo ""
 fi
+trace_phase emit
+trace_finish "$([ -n "$SESSION_ID" ] && echo full || echo untracked)"
 
 exit 0
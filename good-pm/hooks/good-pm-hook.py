@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Good PM Hook Client
+
+Forwards a hook event to good-pm-hookd.py over its Unix domain socket and
+relays the answer. If the server is not running or cannot answer, runs the
+one-shot hook script instead, so the hook output is the same either way.
+
+Usage (from hooks.json, in the project root):
+    python3 -S .claude/hooks/good-pm-hook.py <Stop|UserPromptSubmit>
+"""
+
+import json
+import os
+import socket
+import subprocess
+import sys
+
+SOCKET_PATH = os.path.join(".good-pm", "hookd.sock")
+HOOKS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+FALLBACKS = {
+    "Stop": ["python3", os.path.join(HOOKS_DIR, "good-pm-session-update.py")],
+    "UserPromptSubmit": ["bash", os.path.join(HOOKS_DIR, "good-pm-context.sh")],
+}
+
+# Seconds to wait for the server before falling back to the one-shot script
+RESPONSE_TIMEOUT = 30
+
+# Settings read by the hooks; sent with each request so the server sees the
+# same values the one-shot scripts would
+HOOK_ENV = ("GOOD_PM_CONTEXT_REFRESH", "GOOD_PM_SESSION_BUDGET", "GOOD_PM_TRACE")
+
+
+def ask_server(event: str, hook_input: bytes):
+    """Return the server's response, or None if it is unavailable or errored."""
+    request = {
+        "event": event,
+        "cwd": os.getcwd(),
+        "input": hook_input.decode("utf-8", "replace"),
+        "env": {name: os.environ[name] for name in HOOK_ENV if name in os.environ},
+    }
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(RESPONSE_TIMEOUT)
+            sock.connect(SOCKET_PATH)
+            sock.sendall(json.dumps(request).encode("utf-8"))
+            sock.shutdown(socket.SHUT_WR)
+            chunks = []
+            while True:
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+        response = json.loads(b"".join(chunks).decode("utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(response, dict) or "error" in response:
+        return None
+    return response
+
+
+def main():
+    event = sys.argv[1] if len(sys.argv) > 1 else ""
+    if event not in FALLBACKS:
+        print(f"usage: good-pm-hook.py <{'|'.join(FALLBACKS)}>", file=sys.stderr)
+        return 2
+
+    hook_input = sys.stdin.buffer.read()
+
+    response = ask_server(event, hook_input)
+    if response is not None:
+        sys.stdout.write(response.get("stdout", ""))
+        return response.get("exit", 0)
+
+    # Server not running - run the one-shot hook with the same stdin
+    result = subprocess.run(FALLBACKS[event], input=hook_input)
+    return result.returncode
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -14,161 +14,682 @@ Exit codes:
 - 0 with {"decision": "block", "reason": "..."} - Block and continue conversation
 """
 
+import hashlib
 import json
+import os
 import re
 import sys
+import time
+from contextlib import contextmanager, nullcontext
 from pathlib import Path
 
+try:
+    import fcntl
+except ImportError:  # non-POSIX: state writes stay atomic, just not serialized
+    fcntl = None
+
+PM_KEYWORDS = [
+    "good-pm", ".good-pm", "spec", "issue", "create-spec",
+    "create-issues", "implementation", "acceptance criteria"
+]
+
+# Single compiled matcher for all keywords (the bytes form runs on lowercased raw lines)
+PM_KEYWORD_PATTERN = re.compile(
+    "|".join(re.escape(kw) for kw in PM_KEYWORDS), re.IGNORECASE | re.ASCII
+)
+PM_KEYWORD_BYTES_PATTERN = re.compile(PM_KEYWORD_PATTERN.pattern.encode("ascii"))
+
+# Lines longer than this are never held in memory whole; they are read in chunks
+# and checked for structural tokens instead of being decoded (see drain_oversized_line)
+MAX_LINE_BYTES = 4 * 1024 * 1024
+
+# Inside JSON strings quotes are escaped, so these only match an entry's own keys
+ENTRY_TYPE_BYTES_PATTERN = re.compile(rb'"type"\s*:\s*"(?:user|assistant)"')
+TOOL_USE_BYTES_PATTERN = re.compile(rb'"type"\s*:\s*"tool_use"')
+TOOL_BLOCK_BYTES_PATTERN = re.compile(rb'"type"\s*:\s*"tool_(?:use|result)"')
+# Start of a message text value: a text block or string message content
+TEXT_VALUE_BYTES_PATTERN = re.compile(rb'"(?:text|content)"\s*:\s*"')
+# Bytes carried between chunks so tokens split across a chunk boundary still match
+OVERSIZED_CHUNK_OVERLAP = 64
+
+# Sidecar flag store next to session/current.md (see sync_state)
+STATE_FILE = "state.json"
+STATE_LOCK = "state.lock"
+FRONTMATTER_FLAGS = ("pm_work_detected", "has_content")
+
+# Opt-in instrumentation: GOOD_PM_TRACE=1 appends one JSONL record per event
+TRACE_ENV = "GOOD_PM_TRACE"
+TRACE_FILE = Path(".good-pm") / "trace" / "hooks.jsonl"
+TRACE_MAX_BYTES = 1024 * 1024
+TRACE_BACKUPS = 3
+
+# Bytes before the checkpoint offset that are fingerprinted to detect rewrites
+CHECKPOINT_TAIL_BYTES = 256
+
+# Checkpoints of transcripts without a Stop for this long are deleted
+# (same age as the .injected-* trackers of good-pm-context.sh)
+CHECKPOINT_MAX_AGE = 7 * 24 * 60 * 60
+
+# Block size for reading the transcript backwards from the end
+REVERSE_BLOCK_SIZE = 64 * 1024
+
+# Checkpoints already loaded or saved by this process. Only a long-lived
+# process (good-pm-hookd.py) benefits; a stale entry is still a valid prefix.
+_checkpoint_cache = {}
+
+
+def atomic_write_json(path: Path, obj) -> None:
+    """Write JSON atomically (temp file + rename). Failures are ignored."""
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        tmp.write_text(json.dumps(obj))
+        os.replace(tmp, path)
+    except (IOError, OSError):
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
 
-def check_pm_work_detected(session_path: Path) -> bool:
-    """Check SESSION.md frontmatter for pm_work_detected flag (D4: assumes frontmatter exists)."""
-    if not session_path.exists():
-        return False
 
-    content = session_path.read_text()
-    frontmatter_match = re.match(r'^---\n(.*?)\n---', content, re.DOTALL)
-    if not frontmatter_match:
-        return False  # No frontmatter = no PM work
+def write_trace(record: dict) -> None:
+    """Append a trace record, rotating hooks.jsonl -> .1 -> ... -> .TRACE_BACKUPS."""
+    try:
+        TRACE_FILE.parent.mkdir(exist_ok=True)  # fails outside Good PM projects
+        if TRACE_FILE.exists() and TRACE_FILE.stat().st_size > TRACE_MAX_BYTES:
+            for i in range(TRACE_BACKUPS - 1, 0, -1):
+                older = TRACE_FILE.with_name(f"{TRACE_FILE.name}.{i}")
+                if older.exists():
+                    os.replace(older, TRACE_FILE.with_name(f"{TRACE_FILE.name}.{i + 1}"))
+            os.replace(TRACE_FILE, TRACE_FILE.with_name(f"{TRACE_FILE.name}.1"))
+        with open(TRACE_FILE, "a") as f:
+            f.write(json.dumps(record) + "\n")
+    except (IOError, OSError):
+        pass
 
-    frontmatter = frontmatter_match.group(1)
-    return 'pm_work_detected: true' in frontmatter
 
+class Trace:
+    """Per-event phase timings, counters and decision branch.
 
-def reset_pm_work_detected(session_path: Path) -> None:
-    """Reset pm_work_detected flag to false after processing."""
-    if not session_path.exists():
+    Create with Trace.start(); when GOOD_PM_TRACE is unset it returns
+    NULL_TRACE, whose methods do nothing, so disabled tracing costs a few
+    no-op calls per event.
+    """
+
+    def __init__(self, hook: str, via: str):
+        self._start = time.perf_counter()
+        self.record = {"ts": round(time.time(), 3), "hook": hook, "via": via, "phases": {}}
+        self.stats = {}
+
+    @classmethod
+    def start(cls, hook: str, via: str = "script", environ=None):
+        if not (os.environ if environ is None else environ).get(TRACE_ENV):
+            return NULL_TRACE
+        return cls(hook, via)
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record["phases"][name] = round((time.perf_counter() - start) * 1000, 3)
+
+    def set(self, **fields) -> None:
+        self.record.update(fields)
+
+    def finish(self, branch: str) -> None:
+        self.record.update(self.stats)
+        self.record["branch"] = branch
+        self.record["total_ms"] = round((time.perf_counter() - self._start) * 1000, 3)
+        write_trace(self.record)
+
+
+class _NullTrace:
+    stats = None
+    _phase = nullcontext()
+
+    def phase(self, name: str):
+        return self._phase
+
+    def set(self, **fields) -> None:
+        pass
+
+    def finish(self, branch: str) -> None:
+        pass
+
+
+NULL_TRACE = _NullTrace()
+
+
+@contextmanager
+def state_lock(session_dir: Path):
+    """Serialize state.json updates between concurrent hook processes."""
+    try:
+        lock = open(session_dir / STATE_LOCK, "a") if fcntl else None
+    except (IOError, OSError):
+        lock = None
+    if lock is None:
+        yield
         return
+    with lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def read_frontmatter_flags(session_path: Path) -> dict:
+    """Read pm_work_detected / has_content from frontmatter without reading the body."""
+    flags = dict.fromkeys(FRONTMATTER_FLAGS, False)
+    with open(session_path, "r", errors="replace") as f:
+        if f.readline().rstrip("\n") != "---":
+            return flags  # No frontmatter = no PM work
+        found = dict(flags)
+        for line in f:
+            line = line.rstrip("\n")
+            if line == "---":
+                return found
+            key, _, value = line.partition(":")
+            if key in found:
+                found[key] = value.strip().startswith("true")
+    return flags  # Unterminated frontmatter counts as none
+
+
+def write_frontmatter_flag(session_path: Path, key: str, value: bool) -> bool:
+    """Rewrite one `key: true|false` frontmatter line, keeping the rest byte for byte.
+
+    The file is replaced atomically (temp file + rename), and only if it did
+    not change while it was being read. Returns False when the line is missing
+    or the file could not be rewritten.
+    """
+    try:
+        before = os.stat(session_path)
+        with open(session_path, "rb") as f:
+            lines = f.read().split(b"\n")
+    except (IOError, OSError):
+        return False
+    if not lines or lines[0].rstrip(b"\r") != b"---":
+        return False
+    prefix = key.encode("ascii") + b":"
+    for i in range(1, len(lines)):
+        line = lines[i].rstrip(b"\r")
+        if line == b"---":
+            return False
+        if line.startswith(prefix):
+            ending = lines[i][len(line):]
+            lines[i] = prefix + (b" true" if value else b" false") + ending
+            break
+    else:
+        return False
+
+    tmp = session_path.with_name(f"{session_path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, "wb") as f:
+            f.write(b"\n".join(lines))
+        os.chmod(tmp, before.st_mode & 0o7777)
+        after = os.stat(session_path)
+        if (after.st_mtime_ns, after.st_size) != (before.st_mtime_ns, before.st_size):
+            raise OSError("session file changed while rewriting it")
+        os.replace(tmp, session_path)
+    except (IOError, OSError):
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        return False
+    return True
+
+
+def load_state(session_dir: Path) -> dict:
+    try:
+        state = json.loads((session_dir / STATE_FILE).read_text())
+    except (IOError, OSError, ValueError):
+        return {}
+    return state if isinstance(state, dict) else {}
+
+
+def save_state(session_dir: Path, state: dict) -> None:
+    atomic_write_json(session_dir / STATE_FILE, state)
+
+
+def sync_state(session_path: Path):
+    """Return the flag state for the session file, or None if it does not exist.
+
+    state.json mirrors the frontmatter flags together with the mtime/size of
+    current.md they were read from, so the frontmatter is only re-read when
+    current.md changed. Callers hold state_lock().
+    """
+    try:
+        stat = os.stat(session_path)
+        state = load_state(session_path.parent)
+        if (state.get("session_mtime_ns") == stat.st_mtime_ns
+                and state.get("session_size") == stat.st_size):
+            return state
+        state = read_frontmatter_flags(session_path)
+    except (IOError, OSError):
+        return None
+    state.update(session_mtime_ns=stat.st_mtime_ns, session_size=stat.st_size)
+    save_state(session_path.parent, state)
+    return state
+
 
-    content = session_path.read_text()
-    updated = content.replace('pm_work_detected: true', 'pm_work_detected: false')
-    session_path.write_text(updated)
+def check_pm_work_detected(session_path: Path) -> bool:
+    """Check the pm_work_detected flag (D4: assumes frontmatter exists)."""
+    with state_lock(session_path.parent):
+        state = sync_state(session_path)
+    return bool(state and state.get("pm_work_detected"))
 
 
-def load_transcript(transcript_path):
-    """Load transcript from JSONL file."""
-    transcript = []
+def reset_pm_work_detected(session_path: Path) -> None:
+    """Reset pm_work_detected flag to false after processing.
+
+    Only the flag line of the frontmatter is rewritten, atomically and under
+    state_lock(), so the frontmatter the model reads stays accurate and PM
+    commands re-arm the flag by setting it back to true. If current.md cannot
+    be rewritten, the flag is cleared in state.json alone.
+    """
+    with state_lock(session_path.parent):
+        state = sync_state(session_path)
+        if not (state and state.get("pm_work_detected")):
+            return
+        if write_frontmatter_flag(session_path, "pm_work_detected", False):
+            sync_state(session_path)
+        else:
+            state["pm_work_detected"] = False
+            save_state(session_path.parent, state)
+
+
+def _message_text(content) -> str:
+    """Flatten message content (string or list of blocks) to its text."""
+    if isinstance(content, list):
+        return " ".join(
+            block.get("text", "")
+            for block in content
+            if block.get("type") == "text"
+        )
+    return content if isinstance(content, str) else ""
+
+
+def content_activity(content):
+    """Return (has_tool_usage, has_pm_activity) for one message's content."""
+    has_tool_usage = isinstance(content, list) and any(
+        block.get("type") == "tool_use" for block in content
+    )
+    has_pm_activity = PM_KEYWORD_PATTERN.search(_message_text(content)) is not None
+    return has_tool_usage, has_pm_activity
+
+
+def _string_end(buf: bytes, pos: int) -> int:
+    """Index of the quote closing a JSON string that continues at pos, or -1."""
+    while True:
+        quote = buf.find(b'"', pos)
+        if quote < 0:
+            return -1
+        backslashes = quote - len(buf[:quote].rstrip(b"\\"))
+        if backslashes % 2 == 0:
+            return quote
+        pos = quote + 1
+
+
+def drain_oversized_line(f, chunk: bytes):
+    """Read the rest of an oversized line in chunks. Returns (length, activity).
+
+    The entry is never decoded, so structural tokens stand in for it: a
+    user/assistant entry with a tool_use block counts as tool usage, and one
+    without tool blocks (a long pasted prompt) counts as PM activity when a
+    "text" or string "content" value contains a keyword; metadata such as
+    cwd is not matched. activity is (has_tool_usage, has_pm_activity), or
+    None when the line has no newline yet (still being written).
+    """
+    length = 0
+    is_message = tool_usage = tool_blocks = keyword = in_text = False
+    carry = b""
+    while True:
+        length += len(chunk)
+        buf = carry + chunk
+        is_message = is_message or ENTRY_TYPE_BYTES_PATTERN.search(buf) is not None
+        tool_usage = tool_usage or TOOL_USE_BYTES_PATTERN.search(buf) is not None
+        tool_blocks = tool_blocks or tool_usage or TOOL_BLOCK_BYTES_PATTERN.search(buf) is not None
+        # Walk text values; pos ends at the start of an unfinished value or
+        # just past the last closed one
+        pos = 0
+        while not (keyword or tool_blocks):
+            if not in_text:
+                match = TEXT_VALUE_BYTES_PATTERN.search(buf, pos)
+                if match is None:
+                    break
+                in_text, pos = True, match.end()
+            end = _string_end(buf, pos)
+            value = buf[pos:] if end < 0 else buf[pos:end]
+            keyword = PM_KEYWORD_BYTES_PATTERN.search(value.lower()) is not None
+            if end < 0:
+                break
+            in_text, pos = False, end + 1
+        if chunk.endswith(b"\n"):
+            return length, (is_message and tool_usage, is_message and keyword and not tool_blocks)
+        carry = buf[max(pos, len(buf) - OVERSIZED_CHUNK_OVERLAP):]
+        chunk = f.readline(MAX_LINE_BYTES)
+        if not chunk:
+            return length, None
+
+
+def iter_transcript_lines(transcript_path, offset: int = 0):
+    """Yield (line, end_offset, activity) for complete JSONL lines from a byte offset.
+
+    A trailing line without a newline is still being written and is left for
+    the next run. Oversized lines are drained in chunks (line is None and
+    activity holds the flags from drain_oversized_line), so memory stays
+    bounded regardless of transcript or payload size; activity is None for
+    all other lines.
+    """
+    with open(transcript_path, "rb") as f:
+        f.seek(offset)
+        while True:
+            line = f.readline(MAX_LINE_BYTES)
+            if not line.endswith(b"\n"):
+                if len(line) < MAX_LINE_BYTES:
+                    return  # EOF or partial trailing line
+                length, activity = drain_oversized_line(f, line)
+                if activity is None:
+                    return
+                offset += length
+                yield None, offset, activity
+                continue
+            offset += len(line)
+            yield line, offset, None
+
+
+def scan_transcript_lines(transcript_path, offset: int = 0,
+                          has_tool_usage: bool = False, has_pm_activity: bool = False,
+                          stats=None):
+    """Stream a transcript from offset, accumulating activity flags.
+
+    Lines are prefiltered on raw bytes so only user/assistant entries that
+    could change a flag are JSON-decoded, and scanning stops as soon as both
+    flags are set. Returns (has_tool_usage, has_pm_activity, end_offset).
+    Byte and line counts are added to `stats` when given.
+    """
+    start_offset = offset
+    lines_read = lines_parsed = 0
     try:
-        with open(transcript_path, "r") as f:
-            for line in f:
-                line = line.strip()
+        for line, end_offset, activity in iter_transcript_lines(transcript_path, offset):
+            offset = end_offset
+            lines_read += 1
+            if activity is not None:
+                has_tool_usage = has_tool_usage or activity[0]
+                has_pm_activity = has_pm_activity or activity[1]
+                if has_tool_usage and has_pm_activity:
+                    break
+                continue
+            if b'"user"' not in line and b'"assistant"' not in line:
+                continue
+            # An unescaped "tool_use"/"tool_result" token means list content, whose
+            # text can only live in "text" blocks; tool payloads are not matched
+            has_tool_use_token = b'"tool_use"' in line
+            has_blocks = has_tool_use_token or b'"tool_result"' in line
+            could_use_tools = not has_tool_usage and has_tool_use_token
+            could_match = (
+                not has_pm_activity
+                and (not has_blocks or b'"text"' in line)
+                and PM_KEYWORD_BYTES_PATTERN.search(line.lower()) is not None
+            )
+            if not (could_use_tools or could_match):
+                continue
+            lines_parsed += 1
+            try:
+                entry = json.loads(line)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                continue
+            # Extract message if it's a conversation entry
+            if not isinstance(entry, dict) or entry.get("type") not in ("user", "assistant"):
+                continue
+            message = entry.get("message", {})
+            content = message.get("content", "") if isinstance(message, dict) else ""
+            tool_usage, pm_activity = content_activity(content)
+            has_tool_usage = has_tool_usage or tool_usage
+            has_pm_activity = has_pm_activity or pm_activity
+            if has_tool_usage and has_pm_activity:
+                break
+    except (IOError, OSError):
+        pass
+    if stats is not None:
+        stats["bytes_read"] = stats.get("bytes_read", 0) + offset - start_offset
+        stats["lines_read"] = stats.get("lines_read", 0) + lines_read
+        stats["lines_parsed"] = stats.get("lines_parsed", 0) + lines_parsed
+    return has_tool_usage, has_pm_activity, offset
+
+
+def scan_messages(transcript, has_tool_usage: bool = False, has_pm_activity: bool = False):
+    """Accumulate tool usage / PM keyword activity over a list of messages."""
+    for msg in transcript:
+        tool_usage, pm_activity = content_activity(msg.get("content", ""))
+        has_tool_usage = has_tool_usage or tool_usage
+        has_pm_activity = has_pm_activity or pm_activity
+        if has_tool_usage and has_pm_activity:
+            break
+    return has_tool_usage, has_pm_activity
+
+
+def last_assistant_text(transcript):
+    """Return the text of the last assistant message, or None."""
+    for msg in reversed(transcript):
+        if msg.get("role") == "assistant":
+            return _message_text(msg.get("content", ""))
+    return None
+
+
+def iter_lines_reversed(path, block_size: int = REVERSE_BLOCK_SIZE):
+    """Yield complete lines of a file from last to first.
+
+    Seeks backwards in fixed-size blocks, so memory is bounded by the block
+    size plus the longest line actually yielded.
+    """
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        remainder = b""
+        while position > 0:
+            read_size = min(block_size, position)
+            position -= read_size
+            f.seek(position)
+            chunk = f.read(read_size) + remainder
+            lines = chunk.split(b"\n")
+            # First piece may be the tail of a line that starts in an earlier block
+            remainder = lines[0]
+            for line in reversed(lines[1:]):
                 if line:
-                    try:
-                        entry = json.loads(line)
-                        # Extract message if it's a conversation entry
-                        if "type" in entry and entry["type"] in ("user", "assistant"):
-                            transcript.append({
-                                "role": entry["type"],
-                                "content": entry.get("message", {}).get("content", "")
-                            })
-                    except json.JSONDecodeError:
-                        continue
+                    yield line
+        if remainder:
+            yield remainder
+
+
+def find_last_assistant_message(transcript_path, stats=None):
+    """Return the text of the last assistant entry by reading the transcript backwards."""
+    try:
+        for line in iter_lines_reversed(transcript_path):
+            if stats is not None:
+                stats["tail_bytes_read"] = stats.get("tail_bytes_read", 0) + len(line) + 1
+            if b'"assistant"' not in line:
+                continue
+            try:
+                entry = json.loads(line)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                continue
+            if isinstance(entry, dict) and entry.get("type") == "assistant":
+                return _message_text(entry.get("message", {}).get("content", ""))
     except (IOError, OSError):
         pass
-    return transcript
+    return None
 
 
-def main():
-    # Read hook input from stdin
+def checkpoint_path(session_dir: Path, transcript_path) -> Path:
+    """Per-transcript checkpoint file under .good-pm/session/."""
+    key = os.path.abspath(str(transcript_path)).encode("utf-8", "surrogateescape")
+    digest = hashlib.sha1(key).hexdigest()[:16]
+    return session_dir / f".transcript-{digest}.json"
+
+
+def _tail_digest(f, offset: int) -> str:
+    """Fingerprint the bytes just before offset to detect in-place rewrites."""
+    start = max(0, offset - CHECKPOINT_TAIL_BYTES)
+    f.seek(start)
+    return hashlib.sha1(f.read(offset - start)).hexdigest()
+
+
+def load_checkpoint(path: Path, transcript_path):
+    """Load a checkpoint if it still describes a prefix of the transcript.
+
+    Returns None (forcing a full rescan) when the checkpoint is missing,
+    unreadable, or the transcript was truncated, rotated, or rewritten.
+    """
     try:
-        hook_input = json.load(sys.stdin)
-    except json.JSONDecodeError:
-        # If no valid input, allow completion
-        print(json.dumps({"decision": "approve"}))
-        return 0
+        checkpoint = _checkpoint_cache.get(path)
+        if checkpoint is None:
+            checkpoint = json.loads(path.read_text())
+        offset = int(checkpoint["offset"])
+        stat = os.stat(transcript_path)
+        if stat.st_ino != checkpoint["inode"] or stat.st_size < offset:
+            return None
+        with open(transcript_path, "rb") as f:
+            if _tail_digest(f, offset) != checkpoint["tail"]:
+                return None
+    except (IOError, OSError, ValueError, KeyError, TypeError):
+        return None
+    return checkpoint
+
+
+def save_checkpoint(path: Path, checkpoint: dict) -> None:
+    _checkpoint_cache[path] = checkpoint
+    atomic_write_json(path, checkpoint)
+
+
+def prune_checkpoints(session_dir: Path) -> None:
+    """Delete checkpoints of transcripts idle for more than CHECKPOINT_MAX_AGE."""
+    cutoff = time.time() - CHECKPOINT_MAX_AGE
+    for path in session_dir.glob(".transcript-*.json"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+                _checkpoint_cache.pop(path, None)
+        except OSError:
+            pass
+
+
+def scan_transcript(transcript_path, session_dir: Path, stats=None):
+    """Incrementally scan a transcript, resuming from the saved checkpoint.
+
+    Only lines appended since the previous Stop are parsed. Returns
+    (has_tool_usage, has_pm_activity).
+    """
+    path = checkpoint_path(session_dir, transcript_path)
+    checkpoint = load_checkpoint(path, transcript_path)
+    if stats is not None:
+        stats["checkpoint"] = "resumed" if checkpoint else "rescan"
+    if checkpoint is None:
+        # A new or replaced transcript; a good time to drop stale checkpoints
+        prune_checkpoints(session_dir)
+    checkpoint = checkpoint or {
+        "offset": 0,
+        "has_tool_usage": False,
+        "has_pm_activity": False,
+    }
+
+    has_tool_usage = checkpoint["has_tool_usage"]
+    has_pm_activity = checkpoint["has_pm_activity"]
+    if has_tool_usage and has_pm_activity:
+        # Both flags only ever turn on; nothing appended can change the result
+        return has_tool_usage, has_pm_activity
+
+    has_tool_usage, has_pm_activity, offset = scan_transcript_lines(
+        transcript_path, checkpoint["offset"], has_tool_usage, has_pm_activity, stats
+    )
 
-    # Extract conversation context
-    # Claude Code passes transcript_path, not transcript directly
-    transcript_path = hook_input.get("transcript_path")
-    if transcript_path:
-        transcript = load_transcript(transcript_path)
-    else:
-        transcript = hook_input.get("transcript", [])
+    try:
+        stat = os.stat(transcript_path)
+        with open(transcript_path, "rb") as f:
+            tail = _tail_digest(f, offset)
+    except (IOError, OSError):
+        return has_tool_usage, has_pm_activity
+
+    save_checkpoint(path, {
+        "transcript_path": str(transcript_path),
+        "inode": stat.st_ino,
+        "size": stat.st_size,
+        "offset": offset,
+        "tail": tail,
+        "has_tool_usage": has_tool_usage,
+        "has_pm_activity": has_pm_activity,
+    })
+    return has_tool_usage, has_pm_activity
+
+
+def _finish(trace, branch: str, decision: dict) -> dict:
+    trace.finish(branch)
+    return decision
 
+
+def handle_stop(hook_input: dict, trace=NULL_TRACE) -> dict:
+    """Decide whether the Stop event may complete. Returns the hook decision."""
+    trace.set(session_id=hook_input.get("session_id"))
     stop_hook_active = hook_input.get("stop_hook_active", False)
 
     # Check if we're in a Good PM project
     good_pm_dir = Path(".good-pm")
     if not good_pm_dir.exists():
         # Not a Good PM project, allow completion
-        print(json.dumps({"decision": "approve"}))
-        return 0
+        return _finish(trace, "no_good_pm", {"decision": "approve"})
 
     # Check if session context file exists
     session_file = good_pm_dir / "session" / "current.md"
 
     # If session directory doesn't exist, allow (older Good PM installation)
     if not session_file.parent.exists():
-        print(json.dumps({"decision": "approve"}))
-        return 0
+        return _finish(trace, "no_session_dir", {"decision": "approve"})
 
     # Prevent infinite loops - if we already blocked once, allow completion
     # Reset pm_work_detected flag since the PM work cycle is complete (Bug fix: D2)
     if stop_hook_active:
-        reset_pm_work_detected(session_file)
-        print(json.dumps({"decision": "approve"}))
-        return 0
+        with trace.phase("flag_reset"):
+            reset_pm_work_detected(session_file)
+        return _finish(trace, "stop_hook_active", {"decision": "approve"})
 
     # Early exit if no PM activity detected (Decision D2)
     # This is the ralph-wiggum pattern: check state flag before expensive parsing
-    if not check_pm_work_detected(session_file):
-        print(json.dumps({"decision": "approve"}))
-        return 0
+    with trace.phase("flag_check"):
+        pm_work_detected = check_pm_work_detected(session_file)
+    if not pm_work_detected:
+        return _finish(trace, "no_pm_work", {"decision": "approve"})
 
     # Check if any meaningful PM work was done in this conversation
     # Only block if there were tool calls or PM-related activity
-    has_tool_usage = False
-    has_pm_activity = False
-    last_assistant_msg = None
-
-    pm_keywords = [
-        "good-pm", ".good-pm", "spec", "issue", "create-spec",
-        "create-issues", "implementation", "acceptance criteria"
-    ]
-
-    for msg in transcript:
-        content = msg.get("content", "")
-
-        # Check for tool_use blocks (indicates actual work was done)
-        if isinstance(content, list):
-            for block in content:
-                if block.get("type") == "tool_use":
-                    has_tool_usage = True
-                    break
-
-        # Check for PM-related keywords in messages
-        if isinstance(content, str):
-            lower_content = content.lower()
-            if any(kw in lower_content for kw in pm_keywords):
-                has_pm_activity = True
-        elif isinstance(content, list):
-            text_content = " ".join(
-                block.get("text", "")
-                for block in content
-                if block.get("type") == "text"
+    # Claude Code passes transcript_path, not transcript directly; the path is
+    # scanned incrementally from the last checkpoint so each Stop only parses
+    # the lines appended since the previous one
+    transcript_path = hook_input.get("transcript_path")
+    with trace.phase("transcript_scan"):
+        if transcript_path:
+            has_tool_usage, has_pm_activity = scan_transcript(
+                transcript_path, session_file.parent, trace.stats
             )
-            lower_content = text_content.lower()
-            if any(kw in lower_content for kw in pm_keywords):
-                has_pm_activity = True
+        else:
+            transcript = hook_input.get("transcript", [])
+            has_tool_usage, has_pm_activity = scan_messages(transcript)
 
     # If no tools used and no PM activity, this is a casual conversation - don't block
     # Reset flag (self-healing for stale pm_work_detected: true)
     if not has_tool_usage and not has_pm_activity:
-        reset_pm_work_detected(session_file)
-        print(json.dumps({"decision": "approve"}))
-        return 0
+        with trace.phase("flag_reset"):
+            reset_pm_work_detected(session_file)
+        return _finish(trace, "casual_conversation", {"decision": "approve"})
 
     # Get last assistant message for session update check
-    for msg in reversed(transcript):
-        if msg.get("role") == "assistant":
-            content = msg.get("content", "")
-            if isinstance(content, list):
-                content = " ".join(
-                    block.get("text", "")
-                    for block in content
-                    if block.get("type") == "text"
-                )
-            last_assistant_msg = content
-            break
+    # Read backwards from the end of the transcript - only the last message is parsed
+    with trace.phase("last_message"):
+        if transcript_path:
+            last_assistant_msg = find_last_assistant_message(transcript_path, trace.stats)
+        else:
+            last_assistant_msg = last_assistant_text(transcript)
 
     # Keywords that indicate session context was just updated
     update_indicators = [
@@ -185,18 +706,33 @@ def main():
         lower_msg = last_assistant_msg.lower()
         if any(indicator in lower_msg for indicator in update_indicators):
             # Session was updated, reset flag and approve
-            reset_pm_work_detected(session_file)
-            print(json.dumps({"decision": "approve"}))
-            return 0
+            with trace.phase("flag_reset"):
+                reset_pm_work_detected(session_file)
+            return _finish(trace, "session_updated", {"decision": "approve"})
 
     # Block and request session context review
     # Keep reason concise - detailed instructions are in PM_CONTRACT.md (injected via UserPromptSubmit)
     reason = "Review session context before ending. Check `.good-pm/session/current.md` and apply the Future Self test. Say 'no updates needed' or update the file, then complete your response."
 
-    print(json.dumps({
+    return _finish(trace, "block", {
         "decision": "block",
         "reason": reason
-    }))
+    })
+
+
+def main():
+    trace = Trace.start("stop")
+
+    # Read hook input from stdin
+    try:
+        hook_input = json.load(sys.stdin)
+    except json.JSONDecodeError:
+        # If no valid input, allow completion
+        trace.finish("invalid_input")
+        print(json.dumps({"decision": "approve"}))
+        return 0
+
+    print(json.dumps(handle_stop(hook_input, trace)))
     return 0
 
 
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Good PM Status Engine
+
+Prints the /good-pm:issues status summary (markdown table or JSON) for a
+project. Checkbox counts, titles and Source links are kept in an on-disk
+index (.good-pm/.status-index.json) keyed on file mtime and size, so only
+specs and issues that changed since the last run are re-read.
+
+Usage:
+    python3 .claude/hooks/good-pm-status.py [project-path] [--json]
+
+Exit codes:
+- 0 - Summary printed
+- 1 - Project path missing or Good PM not initialized (message on stdout)
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import re
+import sys
+from pathlib import Path
+
+
+def _load_session_update():
+    """Import good-pm-session-update.py from this directory (shared helpers)."""
+    path = Path(__file__).resolve().parent / "good-pm-session-update.py"
+    spec = importlib.util.spec_from_file_location("good_pm_session_update", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+session_update = _load_session_update()
+
+INDEX_FILE = ".status-index.json"
+INDEX_VERSION = 3
+
+SPEC_PATTERN = re.compile(r"^SPEC_.+\.md$")
+ISSUE_PATTERN = re.compile(r"^(\d{3})-(.+)\.md$")
+
+# Checkboxes at line start (nested ones count equally): - [ ], - [x], - [X]
+CHECKBOX_PATTERN = re.compile(r"^[ \t]*- \[([ xX])\]", re.MULTILINE)
+# Fenced code blocks and HTML comments hide checkboxes (PM_CONTRACT.md parsing rules)
+FENCE_PATTERN = re.compile(r"^ {0,3}(`{3,}|~{3,})")
+COMMENT_PATTERN = re.compile(r"<!--.*?(?:-->|\Z)", re.DOTALL)
+SECTION_PATTERN = re.compile(r"^## (.+?)\s*$", re.MULTILINE)
+SOURCE_SPEC_PATTERN = re.compile(r"(SPEC_[A-Za-z0-9_-]+)\.md")
+
+
+def section_body(content: str, name: str):
+    """Return the text of a `## name` section, or None if absent."""
+    matches = list(SECTION_PATTERN.finditer(content))
+    for i, match in enumerate(matches):
+        if match.group(1) == name:
+            end = matches[i + 1].start() if i + 1 < len(matches) else len(content)
+            return content[match.end():end]
+    return None
+
+
+def strip_ignored(content: str) -> str:
+    """Remove fenced code blocks and HTML comments; an unclosed one runs to the end."""
+    kept = []
+    fence = None
+    for line in content.split("\n"):
+        match = FENCE_PATTERN.match(line)
+        if fence is None:
+            if match:
+                fence = match.group(1)
+            else:
+                kept.append(line)
+        elif match and match.group(1).startswith(fence) and not line[match.end():].strip():
+            fence = None  # closing fence: same character, at least as long, no info string
+    return COMMENT_PATTERN.sub("", "\n".join(kept))
+
+
+def parse_file(path: Path) -> dict:
+    """Extract checkbox counts, title and Source spec from a spec or issue file."""
+    content = path.read_text(errors="replace")
+    marks = CHECKBOX_PATTERN.findall(strip_ignored(content))
+
+    title = None
+    title_body = section_body(content, "Title")
+    if title_body:
+        title = next((line.strip() for line in title_body.splitlines() if line.strip()), None)
+
+    source = None
+    source_body = section_body(content, "Source")
+    if source_body:
+        match = SOURCE_SPEC_PATTERN.search(source_body)
+        if match:
+            source = match.group(1)
+
+    return {
+        "checked": sum(1 for mark in marks if mark != " "),
+        "total": len(marks),
+        "title": title,
+        "source": source,
+    }
+
+
+def load_index(index_path: Path) -> dict:
+    try:
+        index = json.loads(index_path.read_text())
+    except (IOError, OSError, ValueError):
+        return {}
+    if not isinstance(index, dict) or index.get("version") != INDEX_VERSION:
+        return {}
+    return index.get("files", {})
+
+
+def save_index(index_path: Path, files: dict) -> None:
+    """Write the index atomically. Failures are ignored (read-only checkouts)."""
+    session_update.atomic_write_json(index_path, {"version": INDEX_VERSION, "files": files})
+
+
+def scan(good_pm_dir: Path, cached: dict):
+    """Return (entries, changed) for all specs and issues, re-parsing only changed files."""
+    entries = {}
+    changed = False
+    for subdir, pattern in (("specs", SPEC_PATTERN), ("issues", ISSUE_PATTERN)):
+        try:
+            names = sorted(os.listdir(good_pm_dir / subdir))
+        except OSError:
+            continue
+        for name in names:
+            if not pattern.match(name):
+                continue
+            path = good_pm_dir / subdir / name
+            key = f"{subdir}/{name}"
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entry = cached.get(key)
+            if entry is None or entry.get("mtime_ns") != st.st_mtime_ns or entry.get("size") != st.st_size:
+                try:
+                    entry = parse_file(path)
+                except (IOError, OSError):
+                    continue
+                entry.update(mtime_ns=st.st_mtime_ns, size=st.st_size)
+                changed = True
+            entries[key] = entry
+    if set(entries) != set(cached):
+        changed = True
+    return entries, changed
+
+
+def derive_status(checked: int, total: int) -> str:
+    if total == 0:
+        return "No Tasks"
+    if checked == 0:
+        return "Open"
+    if checked == total:
+        return "Complete"
+    return "In Progress"
+
+
+def build_status(project: Path, entries: dict) -> dict:
+    """Group issues under their specs and aggregate spec progress."""
+    specs = {}
+    for key in sorted(entries):
+        subdir, name = key.split("/", 1)
+        if subdir == "specs":
+            specs[name[:-len(".md")]] = {"name": name[:-len(".md")], "checked": 0, "total": 0, "issues": []}
+
+    unlinked = []
+    for key in sorted(entries):
+        subdir, name = key.split("/", 1)
+        if subdir != "issues":
+            continue
+        entry = entries[key]
+        number, slug = ISSUE_PATTERN.match(name).groups()
+        issue = {
+            "number": number,
+            "file": name,
+            "title": entry["title"] or slug,
+            "checked": entry["checked"],
+            "total": entry["total"],
+            "status": derive_status(entry["checked"], entry["total"]),
+        }
+        spec = specs.get(entry["source"])
+        if spec is None:
+            unlinked.append(issue)
+            continue
+        spec["issues"].append(issue)
+        spec["checked"] += issue["checked"]
+        spec["total"] += issue["total"]
+
+    for spec in specs.values():
+        spec["status"] = derive_status(spec["checked"], spec["total"])
+
+    issues = [issue for spec in specs.values() for issue in spec["issues"]] + unlinked
+    issues.sort(key=lambda issue: issue["number"])
+    next_issue = next((i for i in issues if i["status"] == "Open"), None)
+    if next_issue is None:
+        next_issue = next((i for i in issues if i["status"] == "In Progress"), None)
+
+    return {
+        "project": project.name,
+        "specs": list(specs.values()),
+        "unlinked": unlinked,
+        "summary": {
+            "specs": {s: sum(1 for spec in specs.values() if spec["status"] == s)
+                      for s in ("Complete", "In Progress", "Open", "No Tasks")},
+            "issues": {s: sum(1 for issue in issues if issue["status"] == s)
+                       for s in ("Complete", "In Progress", "Open", "No Tasks")},
+            "next": next_issue["file"] if next_issue else None,
+        },
+    }
+
+
+def format_progress(checked: int, total: int) -> str:
+    if total == 0:
+        return "0/0"
+    return f"{checked}/{total} ({round(100 * checked / total)}%)"
+
+
+def table_cell(text: str) -> str:
+    return str(text).replace("|", "\\|")
+
+
+def format_markdown(status: dict) -> str:
+    lines = [f"# {status['project']}", "", "## Specs", ""]
+    lines.append("| Spec | Status | Progress | Issues |")
+    lines.append("|------|--------|----------|--------|")
+    for spec in status["specs"]:
+        lines.append(
+            f"| {spec['name']} | {spec['status']} | "
+            f"{format_progress(spec['checked'], spec['total'])} | {len(spec['issues'])} |"
+        )
+
+    lines += ["", "## Issues"]
+    groups = [(spec["name"], spec["issues"]) for spec in status["specs"] if spec["issues"]]
+    if status["unlinked"]:
+        groups.append(("Unlinked", status["unlinked"]))
+    for name, issues in groups:
+        lines += ["", f"### {name}", ""]
+        lines.append("| # | Title | Status | Progress |")
+        lines.append("|---|-------|--------|----------|")
+        for issue in issues:
+            lines.append(
+                f"| {issue['number']} | {table_cell(issue['title'])} | {issue['status']} | "
+                f"{issue['checked']}/{issue['total']} |"
+            )
+
+    summary = status["summary"]
+    specs, issues = summary["specs"], summary["issues"]
+    issue_counts = f"{issues['Complete']} complete, {issues['In Progress']} in progress, {issues['Open']} open"
+    if issues["No Tasks"]:
+        issue_counts += f", {issues['No Tasks']} no tasks"
+    lines += [
+        "",
+        "## Summary",
+        "",
+        f"- **Specs:** {specs['Complete']} complete, {specs['In Progress']} in progress",
+        f"- **Issues:** {issue_counts}",
+        f"- **Next:** `{summary['next']}`" if summary["next"] else "- **Next:** None",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Good PM status summary")
+    parser.add_argument("project_path", nargs="?", default=".", help="path to project (default: .)")
+    parser.add_argument("--json", action="store_true", help="print JSON instead of markdown")
+    args = parser.parse_args()
+
+    project = Path(args.project_path)
+    if not project.exists():
+        print(f"Directory not found: `{args.project_path}`")
+        return 1
+    if not project.is_dir():
+        print(f"Not a directory: `{args.project_path}`")
+        return 1
+    good_pm_dir = project / ".good-pm"
+    if not good_pm_dir.is_dir():
+        print("Good PM is not initialized. Run `/good-pm:setup` first.")
+        return 1
+
+    index_path = good_pm_dir / INDEX_FILE
+    entries, changed = scan(good_pm_dir, load_index(index_path))
+    if changed:
+        save_index(index_path, entries)
+
+    status = build_status(project.resolve(), entries)
+    if args.json:
+        print(json.dumps(status, indent=2))
+    else:
+        sys.stdout.write(format_markdown(status))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
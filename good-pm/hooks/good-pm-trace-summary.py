@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Good PM Trace Summary
+
+Summarizes the hook trace log written when GOOD_PM_TRACE=1 is set
+(.good-pm/trace/hooks.jsonl and its rotated backups). Records are grouped by
+hook, transport (script or hookd) and decision branch.
+
+Usage:
+    python3 .claude/hooks/good-pm-trace-summary.py [project-path] [--json]
+
+Exit codes:
+- 0 - Summary printed
+- 1 - Project path missing or no trace records found (message on stdout)
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+TRACE_DIR = Path(".good-pm") / "trace"
+TRACE_NAME = "hooks.jsonl"
+TRACE_BACKUPS = 3
+
+# Numeric counters averaged per group when present
+COUNTERS = ("bytes_read", "lines_read", "lines_parsed", "tail_bytes_read")
+
+
+def read_records(trace_dir: Path) -> list:
+    """Read records from the rotated backups (oldest first) and the live log."""
+    paths = [trace_dir / f"{TRACE_NAME}.{i}" for i in range(TRACE_BACKUPS, 0, -1)]
+    paths.append(trace_dir / TRACE_NAME)
+    records = []
+    for path in paths:
+        try:
+            with open(path, "r", errors="replace") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # partial line from a concurrent write
+                    if isinstance(record, dict):
+                        records.append(record)
+        except (IOError, OSError):
+            continue
+    return records
+
+
+def percentile(values: list, pct: float):
+    """Nearest-rank percentile of a sorted list."""
+    if not values:
+        return None
+    rank = max(1, -(-len(values) * pct // 100))
+    return values[int(rank) - 1]
+
+
+def summarize(records: list) -> list:
+    groups = {}
+    for record in records:
+        key = (record.get("hook", "?"), record.get("via", "?"), record.get("branch", "?"))
+        groups.setdefault(key, []).append(record)
+
+    summary = []
+    for (hook, via, branch), group in sorted(groups.items()):
+        totals = sorted(r["total_ms"] for r in group if isinstance(r.get("total_ms"), (int, float)))
+        phases = {}
+        for record in group:
+            for name, ms in (record.get("phases") or {}).items():
+                phases.setdefault(name, []).append(ms)
+        counters = {}
+        for name in COUNTERS:
+            values = [r[name] for r in group if isinstance(r.get(name), (int, float))]
+            if values:
+                counters[name] = round(sum(values) / len(values), 1)
+        checkpoints = {}
+        for record in group:
+            if record.get("checkpoint"):
+                checkpoints[record["checkpoint"]] = checkpoints.get(record["checkpoint"], 0) + 1
+
+        entry = {
+            "hook": hook,
+            "via": via,
+            "branch": branch,
+            "count": len(group),
+            "sessions": len({r.get("session_id") for r in group if r.get("session_id")}),
+            "total_ms": {
+                "p50": percentile(totals, 50),
+                "p95": percentile(totals, 95),
+                "max": totals[-1] if totals else None,
+            },
+            "phases_ms": {
+                name: {"p50": percentile(sorted(values), 50), "p95": percentile(sorted(values), 95)}
+                for name, values in phases.items()
+            },
+            "mean": counters,
+        }
+        if checkpoints:
+            entry["checkpoint"] = checkpoints
+        summary.append(entry)
+    return summary
+
+
+def format_ms(value) -> str:
+    return "-" if value is None else f"{value:.1f}"
+
+
+def format_markdown(summary: list, count: int) -> str:
+    lines = [f"# Hook trace ({count} events)", ""]
+    lines.append("| Hook | Via | Branch | Events | Sessions | p50 ms | p95 ms | max ms |")
+    lines.append("|------|-----|--------|--------|----------|--------|--------|--------|")
+    for entry in summary:
+        total = entry["total_ms"]
+        lines.append(
+            f"| {entry['hook']} | {entry['via']} | {entry['branch']} | {entry['count']} | "
+            f"{entry['sessions']} | {format_ms(total['p50'])} | {format_ms(total['p95'])} | "
+            f"{format_ms(total['max'])} |"
+        )
+
+    for entry in summary:
+        if not entry["phases_ms"] and not entry["mean"]:
+            continue
+        lines += ["", f"## {entry['hook']} / {entry['via']} / {entry['branch']}", ""]
+        for name, ms in entry["phases_ms"].items():
+            lines.append(f"- **{name}:** p50 {format_ms(ms['p50'])} ms, p95 {format_ms(ms['p95'])} ms")
+        for name, value in entry["mean"].items():
+            lines.append(f"- **mean {name}:** {value:g}")
+        if entry.get("checkpoint"):
+            counts = ", ".join(f"{n} {kind}" for kind, n in sorted(entry["checkpoint"].items()))
+            lines.append(f"- **checkpoint:** {counts}")
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Good PM hook trace summary")
+    parser.add_argument("project_path", nargs="?", default=".", help="path to project (default: .)")
+    parser.add_argument("--json", action="store_true", help="print JSON instead of markdown")
+    args = parser.parse_args()
+
+    project = Path(args.project_path)
+    if not project.is_dir():
+        print(f"Directory not found: `{args.project_path}`")
+        return 1
+
+    records = read_records(project / TRACE_DIR)
+    if not records:
+        print("No trace records. Set `GOOD_PM_TRACE=1` in the environment Claude Code runs in.")
+        return 1
+
+    summary = summarize(records)
+    if args.json:
+        print(json.dumps({"events": len(records), "groups": summary}, indent=2))
+    else:
+        sys.stdout.write(format_markdown(summary, len(records)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())